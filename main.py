@@ -1,38 +1,249 @@
-import datetime
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import importlib
+import importlib.util
+import json
+import mimetypes
 import os
+import pathlib
+import re
+import shutil
+import subprocess
+import tempfile
 import threading
+import time
 
 import wx
-import openai
+
+TRANSCRIPTION_MODELS = ("whisper-1", "gpt-4o-transcribe", "gpt-4o-mini-transcribe")
+DEFAULT_TRANSCRIPTION_MODEL = "whisper-1"
+# Models that can stream the transcript back as it is produced, whisper-1 can't
+STREAMING_MODELS = frozenset({"gpt-4o-transcribe", "gpt-4o-mini-transcribe"})
+# Read buffer for the audio file, the multipart body is streamed from it
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+CLIENT_CONNECT_TIMEOUT = 10
+# whisper-1 sends nothing back until the whole recording is transcribed
+CLIENT_READ_TIMEOUT = 600
+CLIENT_MAX_RETRIES = 3
+CLIENT_MAX_KEEPALIVE_CONNECTIONS = 4
+# Long enough for idle connections to survive until the user's next transcription
+CLIENT_KEEPALIVE_EXPIRY = 120
+# Threads for the blocking file work done while transcribing, like hashing
+BLOCKING_WORKERS = 2
+# Whisper resamples everything to 16 kHz mono, so nothing is lost by sending less
+TRANSCODE_ARGS = ("-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k", "-f", "ogg")
+
+AUDIO_WILDCARD = "Audio Files (*.mp3;*.wav;*.m4a;*.ogg)|*.mp3;*.wav;*.m4a;*.ogg"
+
+APP_DIR = os.path.join(os.path.expanduser("~"), ".whisper-gui")
+CACHE_DIR = os.path.join(APP_DIR, "cache")
+# Settings kept between launches, the API key is deliberately not among them
+SETTINGS_PATH = os.path.join(APP_DIR, "settings.json")
+DEFAULT_CACHE_SIZE_MB = 100
+HASH_CHUNK_SIZE = 1024 * 1024
+# Temporary cache files older than this were left behind by a crash
+STALE_TMP_AGE = 24 * 60 * 60
+
+# Characters that are not allowed in file names on at least one platform
+INVALID_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+# File names reserved by Windows, with or without an extension
+RESERVED_FILENAMES = frozenset({"CON", "PRN", "AUX", "NUL",
+                                *(f"COM{i}" for i in range(1, 10)),
+                                *(f"LPT{i}" for i in range(1, 10))})
+
+# Shared OpenAI client, only used from the background event loop
+_client = None
 
 
 def add_newlines(string, line_length):
     words = string.split()
     lines = []
-    current_line = ""
+    current_line = []
+    current_length = 0
 
     for word in words:
-        if len(current_line) + len(word) <= line_length:
-            current_line += " " + word if current_line else word
+        if current_line and current_length + 1 + len(word) > line_length:
+            lines.append(' '.join(current_line))
+            current_line = [word]
+            current_length = len(word)
         else:
-            lines.append(current_line)
-            current_line = word
+            current_line.append(word)
+            current_length += 1 + len(word) if current_length else len(word)
 
     if current_line:
-        lines.append(current_line)
+        lines.append(' '.join(current_line))
 
     return '\n'.join(lines)
 
-def is_valid_filename(filename):
+def get_client():
+    """
+    Returns the shared AsyncOpenAI client, creating it on first use.
+
+    Reusing one client keeps its connection pool, so repeated requests skip the
+    TCP and TLS handshakes. HTTP/2 is used when the optional h2 package is installed.
+    """
+    global _client
+    if _client is None:
+        import httpx
+        import openai
+        http_client = openai.DefaultAsyncHttpxClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_keepalive_connections=CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+                                keepalive_expiry=CLIENT_KEEPALIVE_EXPIRY))
+        # Retries are done by transcribe_stream, which knows which ones are worth the re-upload
+        _client = openai.AsyncOpenAI(http_client=http_client, max_retries=0,
+                                     timeout=httpx.Timeout(CLIENT_READ_TIMEOUT, connect=CLIENT_CONNECT_TIMEOUT))
+    return _client
+
+def update_client_api_key(api_key):
+    """
+    Updates the API key of the shared client, if it was already created.
+
+    :param api_key: New OpenAI API key.
+    :type api_key: str
+    """
+    if _client is not None:
+        _client.api_key = api_key
+
+async def transcribe_stream(audio_file, model):
+    """
+    Uploads the audio file to OpenAI and yields the transcript as it arrives.
+
+    The file object is handed to the SDK as is, so the request body is read from
+    it lazily instead of being loaded into memory first.
+
+    Every retry uploads the whole file again, so requests are only retried on errors
+    that fail fast, and only before any of the transcript was yielded. A timeout
+    means the server was busy with a long recording, so it is never retried.
+
+    :param audio_file: Audio file opened in binary mode.
+    :type audio_file: file object
+    :param model: Transcription model to use.
+    :type model: str
+    """
+    import openai
+
+    client = get_client()
+
+    # Name the upload explicitly so the SDK passes the file object through untouched
+    content_type = mimetypes.guess_type(audio_file.name)[0] or "application/octet-stream"
+    upload = (os.path.basename(audio_file.name), audio_file, content_type)
+
+    for attempt in range(CLIENT_MAX_RETRIES + 1):
+        yielded = False
+        try:
+            if model in STREAMING_MODELS:
+                stream = await client.audio.transcriptions.create(model=model, file=upload, stream=True)
+                async for event in stream:
+                    if event.type == "transcript.text.delta":
+                        yielded = True
+                        yield event.delta
+            else:
+                # The model only returns the whole transcript at once
+                response = await client.audio.transcriptions.create(model=model, file=upload)
+                yielded = True
+                yield response.text
+            return
+        except openai.APITimeoutError:
+            raise
+        except (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError):
+            if yielded or attempt == CLIENT_MAX_RETRIES:
+                raise
+
+        # Back off like the SDK does and upload the file again from its start
+        await asyncio.sleep(2 ** attempt * 0.5)
+        audio_file.seek(0)
+
+async def transcode_audio(source_path, target_path):
+    """
+    Transcodes an audio file to 16 kHz mono Opus with ffmpeg.
+
+    :param source_path: Path of the audio file to transcode.
+    :type source_path: str
+    :param target_path: Path to write the transcoded audio to.
+    :type target_path: str
+    :return: Whether the file was transcoded, False if ffmpeg is missing or failed.
+    :rtype: bool
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return False
+
+    # Write next to the target first so a failed run never leaves a partial file behind
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix=".tmp")
+    os.close(fd)
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            ffmpeg, "-y", "-loglevel", "error", "-i", source_path, *TRANSCODE_ARGS, tmp_path,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        returncode = await process.wait()
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    if returncode != 0:
+        os.remove(tmp_path)
+        return False
+
+    os.replace(tmp_path, target_path)
+    return True
+
+def hash_file(path):
+    """
+    Returns the hex SHA-256 digest of the file's contents.
+
+    :param path: Path of the file to hash.
+    :type path: str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_settings():
+    """
+    Returns the saved settings, or an empty dict if there are none yet.
+    """
+    try:
+        with open(SETTINGS_PATH, encoding="utf-8") as file:
+            settings = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
+
+def write_settings(settings):
+    """
+    Saves the settings, replacing the old file atomically.
+
+    :param settings: Settings to save.
+    :type settings: dict
+    """
+    os.makedirs(APP_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=APP_DIR, suffix=".tmp")
     try:
-        # Check if the filename is valid for the current platform
-        # This checks for invalid characters and reserved names
-        os.path.basename(filename)
+        with open(fd, "w", encoding="utf-8") as file:
+            json.dump(settings, file)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, SETTINGS_PATH)
+
+@functools.lru_cache(maxsize=256)
+def is_valid_filename(filename):
+    # Windows silently strips trailing dots and spaces
+    if not filename or filename.endswith(('.', ' ')):
+        return False
 
-        return True
-    except OSError:
+    if INVALID_FILENAME_CHARS.search(filename):
         return False
 
+    return filename.split('.')[0].upper() not in RESERVED_FILENAMES
+
 class PanelsSwitcher(wx.BoxSizer):
     """
     A sizer for switching between panels in a parent window.
@@ -56,8 +267,12 @@ class PanelsSwitcher(wx.BoxSizer):
         # Save the parent window
         self.parent = parent
 
-        # Save the list of panels
+        # Save the list of panels, and a set of them for quick membership checks
         self.panels = panels
+        self.panel_set = set(panels)
+
+        # No panel is shown yet
+        self.current_panel = None
 
         # Add all the panels into this sizer
         for panel in self.panels:
@@ -74,8 +289,13 @@ class PanelsSwitcher(wx.BoxSizer):
         :type panel: wx.Window
         """
         self.panels.append(panel)
+        self.panel_set.add(panel)
         self.Add(panel, 1, wx.EXPAND)
 
+        # Panels are created visible, keep it hidden until it's shown
+        if panel is not self.current_panel:
+            panel.Hide()
+
     def Show(self, panel):
         """
         Shows the given panel and hides the rest of the panels.
@@ -83,35 +303,229 @@ class PanelsSwitcher(wx.BoxSizer):
         :param panel: Panel to show.
         :type panel: wx.Window
         """
-        # For each panel in the list of panels
+        assert panel in self.panel_set, "panel was not added to this switcher"
+
+        # Nothing to do if the panel is already the one shown
+        if panel is self.current_panel:
+            return
+
+        # Show the given panel and hide the rest of the panels,
+        # wx ignores the calls that don't change a panel's visibility
         for p in self.panels:
-            # Show the given panel
-            if p == panel:
-                p.Show()
-            else:
-                # and hide the rest of the panels
-                p.Hide()
+            p.Show(p is panel)
+
+        self.current_panel = panel
 
         # Rearrange the window
         self.parent.Layout()
 
 
-class HomePanel(wx.Panel):
+class BackgroundLoop:
+    """
+    An asyncio event loop running forever on a daemon thread, with a small
+    shared thread pool for the blocking calls made by its coroutines.
+    """
+
+    def __init__(self):
+        """
+        Constructor for BackgroundLoop, starts the loop's thread.
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=BLOCKING_WORKERS,
+                                                              thread_name_prefix="whisper-io")
+
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        """
+        Schedules a coroutine on the loop from any thread.
+
+        :param coro: Coroutine to run.
+        :type coro: coroutine
+        :return: Future holding the coroutine's result.
+        :rtype: concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+class TranscriptCache:
+    """
+    An on-disk LRU cache of transcripts and transcoded audio, keyed by the
+    digest of the original audio file. Transcripts are also keyed by model.
+    """
+
+    def __init__(self, directory, max_size):
+        """
+        Constructor for TranscriptCache.
+
+        :param directory: Directory to keep the cached files in.
+        :type directory: str
+        :param max_size: Maximum total size of the cache in bytes.
+        :type max_size: int
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, digest, model):
+        """
+        Returns the path of the cache entry for the given digest and model.
+
+        :param digest: Hex digest of the audio file.
+        :type digest: str
+        :param model: Model the audio was transcribed with.
+        :type model: str
+        """
+        return os.path.join(self.directory, f"{digest}-{model}.txt")
+
+    def audio_path(self, digest):
+        """
+        Returns the path of the transcoded audio for the given digest.
+
+        :param digest: Hex digest of the audio file.
+        :type digest: str
+        """
+        return os.path.join(self.directory, f"{digest}.ogg")
+
+    def get_audio(self, digest):
+        """
+        Returns the path of the cached transcoded audio, or None on a miss.
+
+        :param digest: Hex digest of the audio file.
+        :type digest: str
+        """
+        path = self.audio_path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def remove_audio(self, digest):
+        """
+        Removes the transcoded audio for the given digest, if there is any.
+
+        :param digest: Hex digest of the audio file.
+        :type digest: str
+        """
+        with contextlib.suppress(OSError):
+            os.remove(self.audio_path(digest))
+
+    def get(self, digest, model):
+        """
+        Returns the cached transcript for the given digest and model, or None on a miss.
+
+        :param digest: Hex digest of the audio file.
+        :type digest: str
+        :param model: Model the audio was transcribed with.
+        :type model: str
+        """
+        path = self.path(digest, model)
+        try:
+            with open(path, encoding="utf-8") as file:
+                text = file.read()
+        except FileNotFoundError:
+            return None
+
+        # The modification time doubles as the entry's last access time
+        os.utime(path)
+        return text
+
+    def put_file(self, digest, model, transcript_path):
+        """
+        Stores a copy of the transcript file for the given digest and model, and evicts
+        old entries.
+
+        :param digest: Hex digest of the audio file.
+        :type digest: str
+        :param model: Model the audio was transcribed with.
+        :type model: str
+        :param transcript_path: Path of the saved transcript.
+        :type transcript_path: str
+        """
+        # Copy to a temporary file first so a half written entry is never read
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(transcript_path, tmp_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, self.path(digest, model))
+
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_size.
+        """
+        # Entries can be removed by another eviction running at the same time
+        entries = []
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                with contextlib.suppress(OSError):
+                    if now - entry.stat().st_mtime > STALE_TMP_AGE:
+                        os.remove(entry.path)
+            elif entry.name.endswith((".txt", ".ogg")):
+                with contextlib.suppress(OSError):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Still open, like audio being uploaded on Windows, keep it for now
+                continue
+            total_size -= size
+
+
+class ButtonPanel(wx.Panel):
+    """
+    A panel whose buttons share one event handler that dispatches by the button's id.
+
+    Subclasses fill self.button_handlers with a handler for each button's id and
+    bind EVT_BUTTON to on_button.
+    """
+
+    def on_button(self, event):
+        handler = self.button_handlers.get(event.GetId())
+        if handler is None:
+            event.Skip()
+        else:
+            handler(event)
+
+
+class HomePanel(ButtonPanel):
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
         self.sizer = wx.BoxSizer(wx.VERTICAL)
 
         self.selected_file = None
+        # Future of the transcription in progress, if any
+        self.transcription = None
 
         self.error_label = wx.StaticText(self, label="")
-        self.error_label.SetForegroundColour((255, 0, 0))
+        self.label_color = (255, 0, 0)
+        self.error_label.SetForegroundColour(self.label_color)
 
         self.title_label = wx.StaticText(self, label="Choose title:")
         self.title_entry = wx.TextCtrl(self)
         
         self.file_button = wx.Button(self, label="Select Audio File")
         self.file_display = wx.StaticText(self, label="")
+        # Reused for every selection instead of creating a native dialog each time
+        self.file_dialog = wx.FileDialog(self, "Select Audio File", wildcard=AUDIO_WILDCARD, style=wx.FD_OPEN)
 
         self.transcribe_button = wx.Button(self, label="Transcribe")
 
@@ -139,62 +553,144 @@ class HomePanel(wx.Panel):
         self.sizer.Add(self.error_label, 0, wx.ALIGN_CENTER_HORIZONTAL)
 
         self.SetSizer(self.sizer)
-        self.Layout()
-
-        self.Bind(wx.EVT_BUTTON, self.select_audio_file, self.file_button)
-        self.Bind(wx.EVT_BUTTON, self.transcribe, self.transcribe_button)
-        self.Bind(wx.EVT_BUTTON, self.show_settings, self.settings_button)
 
+        self.button_handlers = {
+            self.file_button.GetId(): self.select_audio_file,
+            self.transcribe_button.GetId(): self.transcribe,
+            self.settings_button.GetId(): self.show_settings,
+        }
+        self.Bind(wx.EVT_BUTTON, self.on_button)
+
+    def Destroy(self):
+        self.file_dialog.Destroy()
+        return super().Destroy()
+
+    @contextlib.contextmanager
+    def batch_update(self):
+        # Repaint and lay out the panel once, after all the widgets were changed
+        self.Freeze()
+        try:
+            yield
+            self.Layout()
+        finally:
+            self.Thaw()
+
+    def set_label(self, msg, color):
+        # Every change invalidates the label, so skip the ones that change nothing
+        if color != self.label_color:
+            self.error_label.SetForegroundColour(color)
+            self.label_color = color
+            # Repaint just the label, SetLabel below doesn't run if the text stayed
+            self.error_label.Refresh()
+
+        if msg != self.error_label.GetLabel():
+            self.error_label.SetLabel(msg)
+            self.Layout()
 
     def notify_error(self, msg):
-        self.error_label.SetForegroundColour((255, 0, 0))
-        self.error_label.SetLabel(msg)
-        self.Layout()
+        self.set_label(msg, (255, 0, 0))
+
+    def notify_progress(self, received=0):
+        msg = "Transcribing..."
+        if received:
+            msg += f" ({received} characters received)"
+        # Follow the theme, black text is unreadable on dark themes
+        self.set_label(msg, wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOWTEXT))
 
     def clear_error(self):
-        self.error_label.SetLabel("")
-        self.Layout()
+        self.set_label("", self.label_color)
 
     def select_audio_file(self, event):
         self.clear_error()
-        dlg = wx.FileDialog(self, "Select Audio File", wildcard="Audio Files (*.mp3;*.wav)|*.mp3;*.wav", style=wx.FD_OPEN)
-        if dlg.ShowModal() == wx.ID_OK:
-            self.selected_file = dlg.GetPath()
-            self.file_display.SetLabel(dlg.GetFilename())
-            self.Layout()
-        dlg.Destroy()
-
-    def save_transcript(self, text):
-        if is_valid_filename(self.title_entry.GetValue()) and self.title_entry.GetValue() != '':
-            title = self.title_entry.GetValue()
-        else:
-            current_datetime = datetime.datetime.now()
-            formatted_datetime = current_datetime.strftime("%Y_%m_%d_%H_%M_%S")
+        if self.file_dialog.ShowModal() == wx.ID_OK:
+            self.selected_file = self.file_dialog.GetPath()
+            with self.batch_update():
+                self.file_display.SetLabel(self.file_dialog.GetFilename())
+
+    def transcript_path(self):
+        title = self.title_entry.GetValue()
+        if not is_valid_filename(title):
+            formatted_datetime = time.strftime("%Y_%m_%d_%H_%M_%S")
             title = 'transcript_' + formatted_datetime
-
-        with open(f"{title}.txt", 'w') as file:
-            file.write(text)
-
-        self.error_label.SetForegroundColour((30, 117, 22))
-        self.error_label.SetLabel(f"Saved transcript to '{os.getcwd()}\\{title}.txt'")
-        self.Layout()
-
-
-    def send_audio(self):
-        with open(self.selected_file, "rb") as audio_file:
-            try:
-                response = openai.Audio.transcribe("whisper-1", audio_file)
-            except openai.OpenAIError as e:
-                self.notify_error('OPENAI error: ' + add_newlines(str(e), 50))
-                self.save_transcript('test')
-            else:
-                self.save_transcript(response.data['text'])
+        return pathlib.Path.cwd() / f"{title}.txt"
+
+    def notify_saved(self, transcript_path):
+        self.set_label(f"Saved transcript to '{transcript_path}'", (30, 117, 22))
+
+
+    async def send_audio(self, audio_path, transcript_path, model):
+        import openai
+
+        loop = asyncio.get_running_loop()
+        cache = self.parent.transcript_cache
+        digest = await loop.run_in_executor(None, hash_file, audio_path)
+        text = await loop.run_in_executor(None, cache.get, digest, model)
+        if text is not None:
+            # Written here rather than on the UI thread so errors reach on_transcribe_done
+            await loop.run_in_executor(None, transcript_path.write_bytes, text.encode("utf-8"))
+            wx.CallAfter(self.notify_saved, transcript_path)
+            return
+
+        upload_path = cache.get_audio(digest)
+        if upload_path is None:
+            upload_path = cache.audio_path(digest)
+            if not await transcode_audio(audio_path, upload_path):
+                # Without ffmpeg the original file is uploaded as is
+                upload_path = audio_path
+
+        # The transcript is written out as it arrives, so a failure midway leaves
+        # the part received so far on disk. The file is only created once the
+        # first delta arrives, so a failed request doesn't clobber an older one.
+        fd = None
+        received = 0
+        try:
+            with open(upload_path, "rb", buffering=UPLOAD_BUFFER_SIZE) as audio_file:
+                async for delta in transcribe_stream(audio_file, model):
+                    if fd is None:
+                        fd = os.open(transcript_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                    os.write(fd, delta.encode("utf-8"))
+                    received += len(delta)
+                    wx.CallAfter(self.notify_progress, received)
+        except openai.OpenAIError as e:
+            wx.CallAfter(self.notify_error, 'OPENAI error: ' + add_newlines(str(e), 50))
+            return
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+        if fd is None:
+            # Nothing was transcribed, still save the empty transcript
+            await loop.run_in_executor(None, transcript_path.write_bytes, b"")
+
+        await loop.run_in_executor(None, cache.put_file, digest, model, transcript_path)
+        # Cache hits on the transcript never reach the transcoded audio, it was
+        # only worth keeping in case the upload failed
+        await loop.run_in_executor(None, cache.remove_audio, digest)
+        wx.CallAfter(self.notify_saved, transcript_path)
+
+    def on_transcribe_done(self, future):
+        self.transcription = None
+        if future.cancelled():
+            return
+
+        # Errors that send_audio doesn't handle itself, like failing to read the file
+        error = future.exception()
+        if error is not None:
+            self.notify_error('Error: ' + add_newlines(str(error), 50))
 
     def transcribe(self, event):
         self.clear_error()
-        if self.selected_file:
+        if self.transcription is not None:
+            self.notify_error("A transcription is already in progress.")
+        elif self.selected_file:
             if os.getenv('OPENAI_API_KEY'):
-                threading.Thread(target=self.send_audio).start()
+                # The path is decided up front so the transcript can be written while it streams in
+                transcript_path = self.transcript_path()
+                self.transcription = self.parent.background_loop.submit(
+                    self.send_audio(self.selected_file, transcript_path, self.parent.settings["model"]))
+                self.transcription.add_done_callback(lambda f: wx.CallAfter(self.on_transcribe_done, f))
+                # Hashing, transcoding and uploading can take a while before any text arrives
+                self.notify_progress()
             else:
                 self.notify_error("No API key provided.")
         else:
@@ -205,7 +701,7 @@ class HomePanel(wx.Panel):
         self.parent.sizer.Show(self.parent.settings_panel)
 
 
-class SettingsPanel(wx.Panel):
+class SettingsPanel(ButtonPanel):
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
@@ -215,6 +711,12 @@ class SettingsPanel(wx.Panel):
         
         self.api_key_label = wx.StaticText(self, label="API Key:")
         self.api_key_entry = wx.TextCtrl(self, size=(340, 20))
+        self.model_label = wx.StaticText(self, label="Model:")
+        self.model_choice = wx.Choice(self, choices=list(TRANSCRIPTION_MODELS))
+        self.model_choice.SetStringSelection(self.parent.settings["model"])
+        self.cache_size_label = wx.StaticText(self, label="Cache size (MB):")
+        self.cache_size_entry = wx.SpinCtrl(self, min=0, max=100000,
+                                            initial=self.parent.transcript_cache.max_size // (1024 * 1024))
         self.save_settings_button = wx.Button(self, label="Save")
 
         self.sizer.Add(self.return_home_button, 0, wx.ALIGN_LEFT)
@@ -222,17 +724,57 @@ class SettingsPanel(wx.Panel):
         self.sizer.Add(self.api_key_label, 0, wx.ALIGN_CENTER)
         self.sizer.Add(self.api_key_entry, 0, wx.ALIGN_CENTER)
         self.sizer.AddSpacer(10)
+
+        self.model_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.model_sizer.Add(self.model_label, 0, wx.ALIGN_CENTER_VERTICAL)
+        self.model_sizer.AddSpacer(5)
+        self.model_sizer.Add(self.model_choice, 0, wx.ALL)
+        self.sizer.Add(self.model_sizer, 0, wx.ALIGN_CENTER)
+        self.sizer.AddSpacer(10)
+
+        self.sizer.Add(self.cache_size_label, 0, wx.ALIGN_CENTER)
+        self.sizer.Add(self.cache_size_entry, 0, wx.ALIGN_CENTER)
+        self.sizer.AddSpacer(10)
         self.sizer.Add(self.save_settings_button, 0, wx.ALIGN_CENTER)
 
         self.SetSizer(self.sizer)
-        self.Layout()
 
-        self.Bind(wx.EVT_BUTTON, self.return_to_home, self.return_home_button)
-        self.Bind(wx.EVT_BUTTON, self.save_api_key, self.save_settings_button)
+        self.button_handlers = {
+            self.return_home_button.GetId(): self.return_to_home,
+            self.save_settings_button.GetId(): self.save_settings,
+        }
+        self.Bind(wx.EVT_BUTTON, self.on_button)
+
+    def save_settings(self, event):
+        self.parent.settings["model"] = self.model_choice.GetStringSelection()
+        self.save_cache_size()
+
+        # Writing the settings and evicting touch the disk, keep them off the UI thread
+        future = self.parent.background_loop.executor.submit(self.store_settings, dict(self.parent.settings))
+        future.add_done_callback(lambda f: wx.CallAfter(self.on_settings_stored, f))
+
+        self.save_api_key(event)
+
+    def save_cache_size(self):
+        cache_size_mb = self.cache_size_entry.GetValue()
+        self.parent.settings["cache_size_mb"] = cache_size_mb
+        self.parent.transcript_cache.max_size = cache_size_mb * 1024 * 1024
+
+    def store_settings(self, settings):
+        write_settings(settings)
+        self.parent.transcript_cache.evict()
+
+    def on_settings_stored(self, future):
+        error = future.exception()
+        if error is not None:
+            self.parent.home_panel.notify_error('Error saving settings: ' + add_newlines(str(error), 50))
 
     def save_api_key(self, event):
-        os.environ['OPENAI_API_KEY'] = self.api_key_entry.GetValue()
-        openai.api_key = self.api_key_entry.GetValue()
+        api_key = self.api_key_entry.GetValue()
+        # Save is also used for the cache size, so an empty entry keeps the current key
+        if api_key:
+            os.environ['OPENAI_API_KEY'] = api_key
+            update_client_api_key(api_key)
         self.return_to_home(event)
 
     def return_to_home(self, event):
@@ -242,13 +784,28 @@ class TranscriptionApp(wx.Frame):
     def __init__(self, parent, title):
         super(TranscriptionApp, self).__init__(parent, title=title, size=(500, 300))
 
-        self.home_panel = HomePanel(self)
-        self.settings_panel = SettingsPanel(self)
-
-        self.sizer = PanelsSwitcher(self, [self.home_panel, self.settings_panel])
-        self.SetSizer(self.sizer)
-
-        self.sizer.Show(self.home_panel)
+        self.background_loop = BackgroundLoop()
+        # openai is imported lazily, warm it up while the user picks a file
+        self.background_loop.loop.call_soon_threadsafe(importlib.import_module, "openai")
+        self.settings = read_settings()
+        if self.settings.get("model") not in TRANSCRIPTION_MODELS:
+            self.settings["model"] = DEFAULT_TRANSCRIPTION_MODEL
+        self.transcript_cache = TranscriptCache(
+            CACHE_DIR, self.settings.get("cache_size_mb", DEFAULT_CACHE_SIZE_MB) * 1024 * 1024)
+
+        # Build all the panels frozen and lay the whole window out once at the end
+        self.Freeze()
+        try:
+            self.home_panel = HomePanel(self)
+            self.settings_panel = SettingsPanel(self)
+
+            self.sizer = PanelsSwitcher(self, [self.home_panel, self.settings_panel])
+            self.SetSizer(self.sizer)
+
+            self.sizer.Show(self.home_panel)
+        finally:
+            self.Thaw()
+        self.Layout()
 
 if __name__ == "__main__":
     app = wx.App()